@@ -1,17 +1,30 @@
 # FastAPI application for CalPowerCast
 # This file will hold the FastAPI app
 
+import asyncio
+import logging
+import os
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from anyio import to_thread
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
+import sys
 import uvicorn
 from data_loader import test_database_connection
 from forecast import get_forecast, list_available_counties
 
+logger = logging.getLogger(__name__)
+
 # Create FastAPI app instance
 app = FastAPI(
     title="CalPowerCast API",
     description="Machine learning forecasting API for California household electricity usage",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware to allow requests from localhost:3000 (for frontend)
@@ -23,6 +36,119 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses (e.g. multi-month forecasts) larger than 500 bytes
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=5)
+
+# Forecasts and the county list only change when the model is retrained
+CACHE_HEADERS = {"Cache-Control": "public, max-age=3600"}
+
+
+# Forecasts are deterministic for a given (county, periods) pair; the key
+# space is bounded by the validated county set and the 1-36 periods range.
+# Entries are the serialized JSON body, so a cache hit does no encoding
+_forecast_cache = {}
+
+
+# Upper bound on forecast worker processes
+MAX_WORKERS = 4
+
+
+def _warm_up():
+    """
+    Run one forecast so the model unpickling and XGBoost import happen
+    before the first user request. Also used as the worker initializer.
+    
+    Failures are only logged: an exception here would kill every worker
+    and break the pool, while a missing or unloadable model should reach
+    the caller as the usual per-request error.
+    """
+    try:
+        counties = list_available_counties()
+        if counties:
+            get_forecast(counties[0], 1)
+    except Exception:
+        logger.exception("Forecast warm-up failed")
+
+
+def _ready():
+    """No-op job used to start a worker (and its warm-up) at startup"""
+    return None
+
+
+def _start_executor():
+    """
+    Create the forecast worker pool.
+    
+    Workers are sized from the CPUs this process may run on (which respects
+    container limits, unlike os.cpu_count()) and capped, since each holds
+    its own copy of pandas, XGBoost and the model.
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on Windows/macOS
+        cpus = os.cpu_count() or 1
+    return ProcessPoolExecutor(max_workers=min(MAX_WORKERS, cpus), initializer=_warm_up)
+
+
+async def _run_forecast(county: str, periods: int) -> bytes:
+    """
+    Run _forecast_json in the worker pool. A worker that dies (e.g. is
+    OOM-killed) breaks the whole pool, so replace it and retry once.
+    """
+    loop = asyncio.get_running_loop()
+    executor = app.state.executor
+    try:
+        return await loop.run_in_executor(executor, _forecast_json, county, periods)
+    except BrokenProcessPool:
+        # Concurrent requests may all see the same broken pool; only the
+        # first one replaces it
+        if app.state.executor is executor:
+            app.state.executor = _start_executor()
+            executor.shutdown(wait=False)
+        return await loop.run_in_executor(app.state.executor, _forecast_json, county, periods)
+
+
+def _forecast_json(county: str, periods: int) -> bytes:
+    """
+    Run a forecast and serialize it to JSON in the worker process, so only
+    the encoded bytes are sent back to the API process.
+    """
+    return orjson.dumps(get_forecast(county, periods), option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+# Widen the threadpool, load the county list and start the forecast workers
+@app.on_event("startup")
+async def startup():
+    """
+    Startup hook that configures the threadpool used by sync endpoints,
+    loads the list of available counties once and starts the forecast
+    worker processes.
+    """
+    to_thread.current_default_thread_limiter().total_tokens = 100
+    app.state.counties = list_available_counties()
+    app.state.valid_counties = frozenset(app.state.counties)
+    
+    # Forecasts are CPU-bound, so run them in worker processes that each
+    # warm up their own copy of the model; the initializer does the warm-up,
+    # so a no-op job is enough to launch the first worker
+    app.state.executor = _start_executor()
+    loop = asyncio.get_running_loop()
+    
+    # Best effort: a failed warm-up must not keep the API from starting;
+    # forecast requests report model problems themselves
+    try:
+        await loop.run_in_executor(app.state.executor, _ready)
+    except Exception:
+        logger.exception("Forecast worker warm-up failed; starting without it")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """
+    Stop the forecast worker processes.
+    """
+    app.state.executor.shutdown()
+
 # Root route
 @app.get("/")
 async def root():
@@ -45,7 +171,7 @@ async def health():
 
 # Database health check endpoint
 @app.get("/health/db")
-async def health_db():
+def health_db():
     """
     Database health check endpoint.
     Tests database connectivity and returns connection status.
@@ -68,8 +194,8 @@ async def health_db():
 
 
 @app.get("/forecast")
-async def forecast(county: str = Query(..., description="California county name"), 
-                   periods: int = Query(12, description="Number of months to forecast")):
+async def forecast(county: str = Query(..., min_length=1, max_length=64, description="California county name"), 
+                   periods: int = Query(12, ge=1, le=36, description="Number of months to forecast (1-36)")):
     """
     Generate electricity usage forecast for a specific California county.
     
@@ -83,13 +209,18 @@ async def forecast(county: str = Query(..., description="California county name"
     Example:
         GET /forecast?county=Santa%20Clara&periods=12
     """
-    # Validate periods
-    if periods < 1 or periods > 36:
-        raise HTTPException(status_code=400, detail="Periods must be between 1 and 36")
+    # Reject unknown counties with a set lookup before touching the model
+    if county not in app.state.valid_counties:
+        raise HTTPException(status_code=404, detail=f"Unknown county: {county}")
     
     try:
-        result = get_forecast(county, periods)
-        return result
+        key = (county, periods)
+        body = _forecast_cache.get(key)
+        if body is None:
+            body = await _run_forecast(county, periods)
+            _forecast_cache[key] = body
+        # Send the pre-encoded body as is, skipping jsonable_encoder and re-encoding
+        return Response(content=body, media_type="application/json", headers=CACHE_HEADERS)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -104,20 +235,26 @@ async def counties():
     Returns:
         JSON object containing list of available counties
     """
-    available_counties = list_available_counties()
-    return {
-        "total_counties": len(available_counties),
-        "counties": available_counties
-    }
+    available_counties = app.state.counties
+    return ORJSONResponse(
+        content={
+            "total_counties": len(available_counties),
+            "counties": available_counties
+        },
+        headers=CACHE_HEADERS
+    )
 
 
 if __name__ == "__main__":
-    # Run the app with auto-reload
+    # Run the app with auto-reload, using the uvloop event loop and the
+    # httptools parser from uvicorn[standard] (uvloop is unavailable on Windows)
     uvicorn.run(
         "app:app",
         host="0.0.0.0",
         port=8000,
         reload=True,
+        loop="uvloop" if sys.platform != "win32" else "asyncio",
+        http="httptools",
         reload_dirs=["."]
     )
 
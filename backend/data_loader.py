@@ -2,12 +2,46 @@
 # This file contains database connection and testing functions
 
 import os
+import threading
 from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Database connection URL, resolved once at import
+DB_URL = os.getenv('DB_URL')
+
+# Shared SQLAlchemy engine, created on first use so every caller reuses one pool
+_ENGINE = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def _engine():
+    """
+    Return the shared SQLAlchemy engine, creating it on first use.
+    
+    Safe to call from several threads; only the first call creates the
+    engine, so concurrent first requests never build extra pools.
+    
+    Returns:
+        sqlalchemy.Engine: Database engine
+    """
+    global _ENGINE
+    
+    if _ENGINE is not None:
+        return _ENGINE
+    
+    with _ENGINE_LOCK:
+        if _ENGINE is None:
+            _ENGINE = create_engine(
+                DB_URL,
+                pool_size=10,
+                max_overflow=20,
+                pool_pre_ping=True
+            )
+    return _ENGINE
+
 
 def test_database_connection():
     """
@@ -20,9 +54,7 @@ def test_database_connection():
     try:
         # 1. Load DB connection URL from .env
         print("📋 Loading database connection URL from .env...")
-        db_url = os.getenv('DB_URL')
-        
-        if not db_url:
+        if not DB_URL:
             error_msg = "❌ Error: DB_URL not found in .env file"
             print(error_msg)
             print("   Please ensure .env file exists with DB_URL configuration")
@@ -32,7 +64,7 @@ def test_database_connection():
         
         # 2. Connect using SQLAlchemy
         print("\n🔌 Connecting to PostgreSQL database...")
-        engine = create_engine(db_url)
+        engine = _engine()
         
         # Test the connection
         with engine.connect() as conn:
@@ -71,7 +103,7 @@ def test_database_connection():
 
 def get_database_engine():
     """
-    Create and return a SQLAlchemy engine for database operations.
+    Return the shared SQLAlchemy engine for database operations.
     
     Returns:
         sqlalchemy.Engine: Database engine
@@ -79,12 +111,10 @@ def get_database_engine():
     Raises:
         ValueError: If DB_URL is not configured
     """
-    db_url = os.getenv('DB_URL')
-    
-    if not db_url:
+    if not DB_URL:
         raise ValueError("DB_URL not found in .env file. Please configure it first.")
     
-    return create_engine(db_url)
+    return _engine()
 
 
 if __name__ == '__main__':
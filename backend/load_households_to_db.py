@@ -4,6 +4,7 @@ Load household data into PostgreSQL
 
 import pandas as pd
 import os
+from io import StringIO
 from sqlalchemy import create_engine
 from dotenv import load_dotenv
 
@@ -18,7 +19,12 @@ def load_households_to_db():
     # Read CSV
     csv_path = os.path.join('data', 'households.csv')
     print(f"📖 Reading: {csv_path}")
-    df = pd.read_csv(csv_path)
+    df = pd.read_csv(
+        csv_path,
+        engine='pyarrow',
+        dtype_backend='pyarrow',
+        dtype={'county': 'string[pyarrow]', 'year': 'int16[pyarrow]', 'households': 'int32[pyarrow]'}
+    )
     print(f"   Loaded {len(df)} records")
     
     # Connect to database
@@ -26,7 +32,23 @@ def load_households_to_db():
     engine = create_engine(db_url)
     
     print("\n💾 Inserting into PostgreSQL...")
-    df.to_sql('households', engine, if_exists='replace', index=False)
+    
+    # Stream the rows through COPY instead of per-row INSERTs
+    buf = StringIO()
+    df[['county', 'year', 'households']].to_csv(buf, index=False, header=False)
+    buf.seek(0)
+    
+    raw_conn = engine.raw_connection()
+    try:
+        cur = raw_conn.cursor()
+        cur.execute("DROP TABLE IF EXISTS households")
+        cur.execute(
+            "CREATE TABLE households (county TEXT, year INTEGER, households INTEGER)"
+        )
+        cur.copy_expert("COPY households (county, year, households) FROM STDIN WITH CSV", buf)
+        raw_conn.commit()
+    finally:
+        raw_conn.close()
     
     print(f"✅ Successfully inserted {len(df)} records")
     print("=" * 60)
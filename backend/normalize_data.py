@@ -2,205 +2,136 @@
 Normalize electricity consumption data per household by county, year, and month.
 """
 
+import logging
 import pandas as pd
-import os
-from sqlalchemy import create_engine
+from sqlalchemy import text
 from dotenv import load_dotenv
 import sys
+from data_loader import DB_URL, get_database_engine
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+# Filter, join and normalize entirely inside PostgreSQL so neither source
+# table has to be pulled into Python. A zero household count is treated as
+# missing, so its rows are dropped (and reported as unmatched) instead of
+# aborting the whole statement with a division by zero
+NORMALIZE_QUERY = """
+    CREATE TABLE normalized_power AS
+    SELECT p.county, p.year, p.month,
+           (p.consumption_gwh * 1000000.0 / NULLIF(h.households, 0)) AS kwh_per_household
+    FROM power_consumption p
+    JOIN households h USING (county, year)
+    WHERE p.sector = 'Residential'
+      AND p.year BETWEEN 2022 AND 2024
+      AND p.consumption_gwh IS NOT NULL
+      AND NULLIF(h.households, 0) IS NOT NULL
+"""
+
 
 def normalize_consumption():
     """
     Normalize electricity consumption per household by county, year, and month.
     
-    Loads electricity and household data, merges them, calculates kWh per household,
-    and saves to both CSV and PostgreSQL.
+    Filters residential electricity data, joins it with household data and
+    calculates kWh per household in a single PostgreSQL statement that writes
+    the normalized_power table.
     
     Returns:
         pandas.DataFrame: Normalized consumption data sorted by county, year, month
     """
     try:
-        print("=" * 60)
-        print("🔄 CalPowerCast Data Normalization")
-        print("=" * 60)
-        
-        # 1. Load data from PostgreSQL database
-        print("\n📖 Loading data from PostgreSQL database...")
+        # 1. Connect to PostgreSQL database
+        logger.debug("Connecting to PostgreSQL database")
         
-        db_url = os.getenv('DB_URL')
-        if not db_url:
-            print("❌ Error: DB_URL not found in .env file")
+        if not DB_URL:
+            logger.error("❌ Error: DB_URL not found in .env file")
             return None
         
-        engine = create_engine(db_url)
-        print("   ✅ Connected to database")
-        
-        # Load electricity data from power_consumption table
-        print("   Loading electricity data from power_consumption table...")
-        electricity_df = pd.read_sql("SELECT * FROM power_consumption", engine)
-        print(f"   Electricity data: {len(electricity_df)} rows")
-        
-        # Load households data from households table
-        print("   Loading households data from households table...")
-        households_df = pd.read_sql("SELECT * FROM households", engine)
-        print(f"   Households data: {len(households_df)} rows")
-        
-        # 2. Filter electricity data
-        print("\n🔍 Filtering electricity data...")
-        print("   Filtering for: Sector=Residential, Years=2022-2024")
+        engine = get_database_engine()
         
-        # Filter for Residential sector and years 2022-2024
-        filtered_df = electricity_df[
-            (electricity_df['sector'] == 'Residential') &
-            (electricity_df['year'] >= 2022) &
-            (electricity_df['year'] <= 2024)
-        ].copy()
+        # 2. Count electricity rows matching the filter
+        logger.debug("Filtering for: Sector=Residential, Years=2022-2024")
         
-        print(f"   Filtered to: {len(filtered_df)} rows")
-        
-        if len(filtered_df) == 0:
-            print("❌ Error: No data matches the filter criteria")
-            return None
-        
-        # 3. Check required columns in electricity data
-        required_cols = ['county', 'year', 'month', 'consumption_gwh']
-        missing_cols = [col for col in required_cols if col not in filtered_df.columns]
-        
-        if missing_cols:
-            print(f"❌ Error: Missing required columns in electricity data: {missing_cols}")
-            print(f"   Available columns: {filtered_df.columns.tolist()}")
-            return None
+        with engine.connect() as conn:
+            filtered_count = conn.execute(text(
+                "SELECT COUNT(*) FROM power_consumption "
+                "WHERE sector = 'Residential' AND year BETWEEN 2022 AND 2024"
+            )).scalar()
         
-        # 4. Check required columns in households data
-        household_cols = ['county', 'year', 'households']
-        missing_cols = [col for col in household_cols if col not in households_df.columns]
+        logger.debug("Filtered to: %d rows", filtered_count)
         
-        if missing_cols:
-            print(f"❌ Error: Missing required columns in households data: {missing_cols}")
-            print(f"   Available columns: {households_df.columns.tolist()}")
+        if filtered_count == 0:
+            logger.error("❌ Error: No data matches the filter criteria")
             return None
         
-        # 5. Merge data on county and year
-        print("\n🔗 Merging electricity and household data...")
-        
-        # Select only needed columns for merge
-        electricity_merge = filtered_df[['county', 'year', 'month', 'consumption_gwh']].copy()
-        households_merge = households_df[['county', 'year', 'households']].copy()
-        
-        # Perform merge
-        merged_df = electricity_merge.merge(
-            households_merge,
-            on=['county', 'year'],
-            how='inner'  # Only keep records that exist in both
+        # 3. Merge with household data and calculate kWh per household
+        logger.debug("Writing normalized_power table")
+        
+        # Rebuild the table and its lookup index in one transaction, creating
+        # the index after the bulk insert rather than maintaining it per row
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS normalized_power"))
+            conn.execute(text(NORMALIZE_QUERY))
+            conn.execute(text(
+                "CREATE INDEX idx_norm_county_year_month "
+                "ON normalized_power (county, year, month)"
+            ))
+        
+        # 4. Load the normalized result; the (county, year, month) index
+        # provides the ordering, so the table itself is written unsorted
+        result_df = pd.read_sql(
+            "SELECT county, year, month, kwh_per_household "
+            "FROM normalized_power ORDER BY county, year, month",
+            engine
         )
         
-        print(f"   After merge: {len(merged_df)} rows")
+        logger.debug("After merge: %d rows", len(result_df))
         
-        if len(merged_df) == 0:
-            print("❌ Error: No matching records after merge")
-            print("   Check that county and year values match between datasets")
+        if len(result_df) == 0:
+            logger.error(
+                "❌ Error: No matching records after merge. "
+                "Check that county and year values match between datasets"
+            )
             return None
         
-        # 6. Check for mismatches
-        unmatched = len(filtered_df) - len(merged_df)
+        # 5. Check for mismatches
+        unmatched = filtered_count - len(result_df)
         if unmatched > 0:
-            print(f"⚠️  Warning: {unmatched} electricity records unmatched (no household data)")
-        
-        # 7. Check for NaN values
-        print("\n🔍 Checking data quality...")
-        nan_counts = merged_df.isnull().sum()
-        if nan_counts.sum() > 0:
-            print(f"⚠️  Warning: Found NaN values:")
-            for col, count in nan_counts[nan_counts > 0].items():
-                print(f"   {col}: {count}")
-            
-            # Drop rows with NaN values
-            rows_before = len(merged_df)
-            merged_df = merged_df.dropna()
-            rows_after = len(merged_df)
-            print(f"   Removed {rows_before - rows_after} rows with NaN values")
-        
-        # 8. Calculate kWh per household
-        print("\n🧮 Calculating kWh per household...")
-        
-        # Convert GWh to kWh and divide by households
-        merged_df['kwh_per_household'] = (
-            merged_df['consumption_gwh'] * 1_000_000
-        ) / merged_df['households']
-        
-        # Select final columns
-        result_df = merged_df[['county', 'year', 'month', 'kwh_per_household']].copy()
-        
-        # 9. Print statistics
-        print("\n📊 Data Statistics:")
-        print(f"   Total records: {len(result_df)}")
-        print(f"   Counties: {len(result_df['county'].unique())}")
-        print(f"   Years: {sorted(result_df['year'].unique())}")
-        print(f"   Min kWh/household: {result_df['kwh_per_household'].min():.2f}")
-        print(f"   Max kWh/household: {result_df['kwh_per_household'].max():.2f}")
-        print(f"   Mean kWh/household: {result_df['kwh_per_household'].mean():.2f}")
-        
-        # 10. Sort by county, year, month
-        result_df = result_df.sort_values(['county', 'year', 'month']).reset_index(drop=True)
-        print(f"   Data sorted by county, year, month")
-        
-        # 11. Save to PostgreSQL (main storage)
-        print("\n💾 Saving to PostgreSQL...")
-        
-        # Get database connection
-        db_url = os.getenv('DB_URL')
-        if not db_url:
-            print("❌ Error: DB_URL not found in .env file")
-            return result_df
-        
-        # Create engine
-        engine = create_engine(db_url)
-        
-        # Connect and insert data
-        print("   Connecting to database...")
-        with engine.connect() as conn:
-            print("   ✅ Connected")
-        
-        print("   Inserting data into normalized_power table...")
-        result_df.to_sql(
-            'normalized_power',
-            engine,
-            if_exists='replace',  # Replace table if it exists
-            index=False
+            logger.warning(
+                "⚠️  Warning: %d electricity records unmatched or incomplete (no household data)",
+                unmatched
+            )
+        
+        # 6. Log a single summary, computing the kWh statistics in one pass
+        stats = result_df['kwh_per_household'].agg(['min', 'max', 'mean'])
+        logger.info(
+            "✅ Normalization completed: %d rows in normalized_power table, "
+            "%d counties, years %s, kWh/household min %.2f / max %.2f / mean %.2f",
+            len(result_df),
+            result_df['county'].nunique(),
+            sorted(result_df['year'].unique().tolist()),
+            stats['min'],
+            stats['max'],
+            stats['mean']
         )
-        print("   ✅ Data inserted successfully")
-        
-        # Print summary
-        print("\n" + "=" * 60)
-        print("✅ Normalization completed successfully!")
-        print("=" * 60)
-        print(f"\n📁 Output:")
-        print(f"   PostgreSQL: normalized_power table ({len(result_df)} rows)")
-        print(f"   ✅ All data now stored in PostgreSQL database")
         
         return result_df
         
-    except FileNotFoundError as e:
-        print(f"❌ File not found: {e}")
-        return None
-    except pd.errors.EmptyDataError:
-        print("❌ Error: CSV file is empty")
-        return None
-    except pd.errors.ParserError as e:
-        print(f"❌ Error: Failed to parse CSV file - {e}")
-        return None
     except Exception as e:
-        print(f"❌ Error occurred: {type(e).__name__}")
-        print(f"   Details: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error occurred: %s", type(e).__name__)
         return None
 
-
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    print("=" * 60)
+    print("🔄 CalPowerCast Data Normalization")
+    print("=" * 60)
+    
     result = normalize_consumption()
     
     if result is not None:
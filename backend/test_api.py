@@ -3,7 +3,7 @@ Quick test script to demonstrate the CalPowerCast API endpoints
 Run this after starting the server with: python backend/app.py
 """
 
-import requests
+import httpx
 import json
 
 BASE_URL = "http://localhost:8000"
@@ -11,20 +11,27 @@ BASE_URL = "http://localhost:8000"
 def test_endpoints():
     print("🧪 Testing CalPowerCast API Endpoints\n")
     
+    # Share one keep-alive connection across all requests
+    with httpx.Client(base_url=BASE_URL) as client:
+        run_checks(client)
+    
+    print("✅ All tests completed!")
+
+def run_checks(client):
     # 1. Test root endpoint
     print("1️⃣  Testing GET /")
-    response = requests.get(f"{BASE_URL}/")
+    response = client.get("/")
     print(f"   Response: {json.dumps(response.json(), indent=2)}\n")
     
     # 2. Test counties endpoint
     print("2️⃣  Testing GET /counties")
-    response = requests.get(f"{BASE_URL}/counties")
+    response = client.get("/counties")
     data = response.json()
     print(f"   Available counties: {', '.join(data['counties'])}\n")
     
     # 3. Test forecast endpoint
     print("3️⃣  Testing GET /forecast?county=Santa Clara&periods=6")
-    response = requests.get(f"{BASE_URL}/forecast", params={"county": "Santa Clara", "periods": 6})
+    response = client.get("/forecast", params={"county": "Santa Clara", "periods": 6})
     data = response.json()
     print(f"   County: {data['county']}")
     print(f"   Periods: {data['periods']}")
@@ -35,16 +42,14 @@ def test_endpoints():
     
     # 4. Test error handling
     print("4️⃣  Testing error handling with invalid county")
-    response = requests.get(f"{BASE_URL}/forecast", params={"county": "Invalid County"})
+    response = client.get("/forecast", params={"county": "Invalid County"})
     print(f"   Status Code: {response.status_code}")
     print(f"   Error: {response.json()}\n")
-    
-    print("✅ All tests completed!")
 
 if __name__ == "__main__":
     try:
         test_endpoints()
-    except requests.exceptions.ConnectionError:
+    except httpx.ConnectError:
         print("❌ Error: Cannot connect to API. Is the server running?")
         print("   Start it with: cd backend && python app.py")
     except Exception as e:
@@ -11,6 +11,7 @@ from sqlalchemy import create_engine
 from dotenv import load_dotenv
 import joblib
 import json
+import warnings
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 
 try:
@@ -23,36 +24,76 @@ except ImportError:
 load_dotenv()
 
 
+# Angular step per unit for the cyclic features: a 4-year cycle over the
+# year and a 12-month seasonal cycle over the month
+YEAR_CYCLE = 2 * np.pi / 4.0
+MONTH_CYCLE = 2 * np.pi / 12.0
+
+
 def create_features(df):
     """Create time-based features from year and month"""
     df = df.copy()
     
-    # Create datetime column
-    df['date'] = pd.to_datetime(df[['year', 'month']].assign(day=1))
+    # Create datetime column with integer arithmetic on datetime64 units
+    df['date'] = (
+        (df['year'].to_numpy(dtype=np.int64) - 1970).astype('datetime64[Y]')
+        + (df['month'].to_numpy(dtype=np.int64) - 1).astype('timedelta64[M]')
+    ).astype('datetime64[ns]')
+    
+    # Time features; each angle is computed once and shared by sin and cos
+    year_angle = df['year'].to_numpy() * YEAR_CYCLE  # Year cycles
+    month_angle = df['month'].to_numpy() * MONTH_CYCLE  # Seasonal cycles
+    df['year_sin'] = np.sin(year_angle)
+    df['year_cos'] = np.cos(year_angle)
+    df['month_sin'] = np.sin(month_angle)
+    df['month_cos'] = np.cos(month_angle)
     
-    # Time features
-    df['year_sin'] = np.sin(2 * np.pi * df['year'] / 4.0)  # Year cycles
-    df['year_cos'] = np.cos(2 * np.pi * df['year'] / 4.0)
-    df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12.0)  # Seasonal cycles
-    df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12.0)
+    # Group once and reuse it; every per-county step below uses pandas'
+    # built-in groupby kernels rather than a Python callback per county
+    by_county = df.groupby('county', sort=False)
     
     # Trend
-    df['trend'] = df.groupby('county')['date'].transform(
-        lambda x: (x - x.min()).dt.days / 365.0
-    )
+    df['trend'] = (df['date'] - by_county['date'].transform('min')).dt.days / 365.0
     
     # Lag features (previous month consumption)
-    df['lag_1'] = df.groupby('county')['kwh_per_household'].shift(1)
-    df['lag_12'] = df.groupby('county')['kwh_per_household'].shift(12)  # Same month last year
+    df['lag_1'] = by_county['kwh_per_household'].shift(1)
+    df['lag_12'] = by_county['kwh_per_household'].shift(12)  # Same month last year
     
-    # Rolling average
-    df['rolling_mean_3'] = df.groupby('county')['kwh_per_household'].transform(
-        lambda x: x.rolling(window=3, min_periods=1).mean()
+    # Rolling average (droplevel restores the original row index for alignment)
+    df['rolling_mean_3'] = (
+        by_county['kwh_per_household'].rolling(window=3, min_periods=1).mean().droplevel(0)
     )
     
     return df
 
 
+def select_device():
+    """
+    Pick the XGBoost device to train on.
+    
+    XGBoost does not raise when no GPU is present; it warns and silently
+    trains on the CPU. So use CUDA only when this build supports it and a
+    one-round probe actually ran on a GPU.
+    
+    Returns:
+        str: 'cuda' or 'cpu'
+    """
+    if not xgb.build_info().get('USE_CUDA', False):
+        return 'cpu'
+    
+    probe_data = xgb.DMatrix(np.zeros((2, 1)), label=np.zeros(2))
+    with warnings.catch_warnings():
+        # The "Device is changed from GPU to CPU" warning is the expected
+        # outcome of a failed probe, not something to show the user
+        warnings.simplefilter('ignore')
+        try:
+            probe = xgb.train({'device': 'cuda', 'tree_method': 'hist'}, probe_data, num_boost_round=1)
+        except xgb.core.XGBoostError:
+            return 'cpu'
+    
+    return json.loads(probe.save_config())['learner']['generic_param']['device']
+
+
 def train_unified_model():
     """Train a single model for all counties"""
     
@@ -72,7 +113,8 @@ def train_unified_model():
         FROM normalized_power
         ORDER BY county, year, month
     """
-    df = pd.read_sql(query, engine)
+    # County as an Arrow string column; numeric features stay NumPy for XGBoost
+    df = pd.read_sql(query, engine, dtype={'county': 'string[pyarrow]'})
     print(f"   ✅ Loaded {len(df)} records from database")
     print(f"   Counties: {df['county'].nunique()}")
     
@@ -118,7 +160,7 @@ def train_unified_model():
     
     # 6. Train XGBoost model
     print("\n🚀 Training XGBoost model...")
-    model = xgb.XGBRegressor(
+    model_params = dict(
         n_estimators=100,
         max_depth=6,
         learning_rate=0.1,
@@ -129,8 +171,18 @@ def train_unified_model():
         enable_categorical=False  # We'll use encoded county
     )
     
+    # Build the histograms on the GPU when one is available (XGBoost >= 2.0)
+    model = xgb.XGBRegressor(**model_params, device=select_device())
     model.fit(X_train, y_train)
-    print("   ✅ Model trained")
+    
+    # Report the device the booster actually trained on
+    booster_config = json.loads(model.get_booster().save_config())
+    device = booster_config['learner']['generic_param']['device']
+    print(f"   ✅ Model trained on {'GPU' if device.startswith('cuda') else 'CPU'} (device={device})")
+    
+    # Predict and save for the CPU: the evaluation data lives in host memory
+    # and the forecast API loads this model on machines without a GPU
+    model.set_params(device='cpu')
     
     # 7. Evaluate
     print("\n📈 Evaluating model...")
@@ -161,7 +213,8 @@ def train_unified_model():
     
     # Save model
     model_path = 'model/unified_forecast_model.pkl'
-    joblib.dump(model, model_path)
+    # lz4-compressed; joblib.load detects the codec, so loaders are unchanged
+    joblib.dump(model, model_path, compress=('lz4', 3))
     print(f"   ✅ Model saved: {model_path}")
     
     # Save metadata
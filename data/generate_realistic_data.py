@@ -5,7 +5,9 @@ Based on actual California demographics and energy patterns
 """
 
 import pandas as pd
-import random
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import os
 
 # All 58 California Counties with approximate population/economic weights
@@ -51,7 +53,6 @@ CALIFORNIA_COUNTIES = [
     ('Tuolumne', 54400, 21000),
     ('San Benito', 64500, 24000),
     ('Nevada', 102000, 40000),
-    ('Tulare', 473000, 150000),
     ('Calaveras', 45900, 17000),
     ('Amador', 41200, 15000),
     ('Sierra', 3100, 1200),
@@ -68,104 +69,90 @@ CALIFORNIA_COUNTIES = [
     ('Del Norte', 27000, 10000),
     ('Siskiyou', 44000, 17000),
     ('Plumas', 19400, 7600),
+    ('Trinity', 16000, 6400),
 ]
 
+# A repeated county would generate duplicate rows and oversample it in training
+assert len({name for name, _, _ in CALIFORNIA_COUNTIES}) == len(CALIFORNIA_COUNTIES) == 58, \
+    "CALIFORNIA_COUNTIES must list each of the 58 counties exactly once"
+
+# Seasonal variation (real CA electricity patterns), indexed by month - 1:
+# winter heating (Dec/Jan), late winter (Feb/Mar), moderate months
+# (Apr/May/Oct/Nov), early/late summer (Jun/Sep), peak summer AC (Jul/Aug)
+SEASONAL_MULT = np.array([1.20, 1.10, 1.10, 0.95, 0.95, 1.15, 1.35, 1.35, 1.15, 0.95, 0.95, 1.20])
+
 
 def generate_realistic_data():
     print("=" * 60)
     print("🏗️  Generating Realistic Sample Data")
-    print("   58 California Counties, 2020-2024")
+    print(f"   {len(CALIFORNIA_COUNTIES)} California Counties, 2020-2024")
     print("=" * 60)
     
     # Set seed for reproducibility
-    random.seed(42)
+    np.random.seed(42)
+    
+    county_names = [county_name for county_name, _, _ in CALIFORNIA_COUNTIES]
+    populations = np.array([population for _, population, _ in CALIFORNIA_COUNTIES])
+    base_households = np.array([households for _, _, households in CALIFORNIA_COUNTIES])
     
     # Generate Household Data
     print("\n📊 Generating household data...")
-    households_data = []
-    
-    for county_name, population, households in CALIFORNIA_COUNTIES:
-        for year in range(2020, 2025):
-            # Add realistic growth variation (1-3% per year)
-            year_offset = year - 2020
-            growth_factor = 1.0 + (year_offset * 0.015)  # 1.5% average growth
-            
-            # Add random variation per year
-            variation = random.uniform(-0.02, 0.02)
-            
-            # Calculate households for this year
-            year_households = int(households * growth_factor * (1 + variation))
-            
-            households_data.append({
-                'county': county_name,
-                'year': year,
-                'households': year_households
-            })
-    
-    households_df = pd.DataFrame(households_data)
-    households_df.to_csv('data/households.csv', index=False)
+    household_years = np.arange(2020, 2025)
+    
+    # Add realistic growth variation (1-3% per year)
+    growth_factor = 1.0 + (household_years - 2020) * 0.015  # 1.5% average growth
+    
+    # Add random variation per county and year
+    variation = np.random.uniform(-0.02, 0.02, size=(len(county_names), len(household_years)))
+    
+    # Calculate households for every (county, year)
+    household_counts = (base_households[:, None] * growth_factor * (1 + variation)).astype(int)
+    
+    households_df = pd.DataFrame({
+        'county': np.repeat(county_names, len(household_years)),
+        'year': np.tile(household_years, len(county_names)),
+        'households': household_counts.ravel()
+    })
+    pa_csv.write_csv(pa.Table.from_pandas(households_df, preserve_index=False), 'data/households.csv')
     print(f"   ✅ Created households.csv: {len(households_df)} records")
     print(f"   Counties: {len(CALIFORNIA_COUNTIES)}")
     print(f"   Years: 2020-2024")
     
     # Generate Electricity Consumption Data
     print("\n⚡ Generating electricity consumption data...")
-    electricity_data = []
-    
-    for county_name, population, households in CALIFORNIA_COUNTIES:
-        for year in [2022, 2023, 2024]:  # Only 2022-2024 for electricity
-            for month in range(1, 13):
-                # Get household count for this year
-                county_households_data = households_df[
-                    (households_df['county'] == county_name) & 
-                    (households_df['year'] == year)
-                ]
-                
-                if len(county_households_data) > 0:
-                    num_households = county_households_data.iloc[0]['households']
-                    
-                    # Base consumption per household (kWh per month)
-                    # Typical CA household uses 500-900 kWh/month (varies by region)
-                    base_monthly_kwh = random.uniform(550, 850)
-                    
-                    # Adjust for county size/wealth (urban vs rural)
-                    if population > 3000000:  # Major metro areas
-                        base_monthly_kwh *= 0.9  # Slightly lower (efficiency)
-                    elif population < 50000:  # Rural areas
-                        base_monthly_kwh *= 1.2  # Higher (heating/cooling less efficient)
-                    
-                    # Seasonal variation (real CA electricity patterns)
-                    seasonal_multiplier = 1.0
-                    if month in [7, 8]:  # Peak summer (AC)
-                        seasonal_multiplier = 1.35
-                    elif month in [6, 9]:  # Early/late summer
-                        seasonal_multiplier = 1.15
-                    elif month in [12, 1]:  # Winter heating
-                        seasonal_multiplier = 1.20
-                    elif month in [2, 3]:  # Late winter
-                        seasonal_multiplier = 1.10
-                    elif month in [4, 5, 10, 11]:  # Moderate months
-                        seasonal_multiplier = 0.95
-                    
-                    # Calculate monthly consumption in kWh
-                    monthly_kwh = base_monthly_kwh * seasonal_multiplier
-                    
-                    # Add random variation
-                    monthly_kwh *= random.uniform(0.95, 1.05)
-                    
-                    # Convert kWh to GWh
-                    monthly_gwh = (monthly_kwh * num_households) / 1_000_000
-                    
-                    electricity_data.append({
-                        'county': county_name,
-                        'year': year,
-                        'month': month,
-                        'sector': 'Residential',
-                        'consumption_gwh': round(monthly_gwh, 3)
-                    })
-    
-    electricity_df = pd.DataFrame(electricity_data)
-    electricity_df.to_csv('data/electricity_raw.csv', index=False)
+    years = np.array([2022, 2023, 2024])  # Only 2022-2024 for electricity
+    months = np.arange(1, 13)
+    shape = (len(county_names), len(years), len(months))
+    
+    # Household count for every (county, year), taken straight from the
+    # household array instead of filtering households_df
+    households_arr = household_counts[:, years - household_years[0]]
+    
+    # Base consumption per household (kWh per month)
+    # Typical CA household uses 500-900 kWh/month (varies by region)
+    base_monthly_kwh = np.random.uniform(550, 850, size=shape)
+    
+    # Adjust for county size/wealth (urban vs rural): major metro areas are
+    # slightly lower (efficiency), rural areas higher (less efficient heating/cooling)
+    size_multiplier = np.where(populations > 3000000, 0.9, np.where(populations < 50000, 1.2, 1.0))
+    
+    # Calculate monthly consumption in kWh
+    monthly_kwh = base_monthly_kwh * size_multiplier[:, None, None] * SEASONAL_MULT[months - 1]
+    
+    # Add random variation
+    monthly_kwh *= np.random.uniform(0.95, 1.05, size=shape)
+    
+    # Convert kWh to GWh
+    monthly_gwh = (monthly_kwh * households_arr[:, :, None]) / 1_000_000
+    
+    electricity_df = pd.DataFrame({
+        'county': np.repeat(county_names, len(years) * len(months)),
+        'year': np.tile(np.repeat(years, len(months)), len(county_names)),
+        'month': np.tile(months, len(county_names) * len(years)),
+        'sector': 'Residential',
+        'consumption_gwh': monthly_gwh.ravel().round(3)
+    })
+    pa_csv.write_csv(pa.Table.from_pandas(electricity_df, preserve_index=False), 'data/electricity_raw.csv')
     print(f"   ✅ Created electricity_raw.csv: {len(electricity_df)} records")
     print(f"   Counties: {len(CALIFORNIA_COUNTIES)}")
     print(f"   Years: 2022-2024")
@@ -1,21 +1,130 @@
 # Script to insert data into PostgreSQL
 # This will connect CSV files to PostgreSQL database
 
+import csv
+import io
+from concurrent.futures import ThreadPoolExecutor
+import duckdb
 import pandas as pd
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from dotenv import load_dotenv
 import sys
 
 # Load environment variables from .env file
 load_dotenv()
 
+def psql_insert_copy(table, conn, keys, data_iter):
+    """
+    to_sql insertion method that streams rows through PostgreSQL COPY.
+    
+    Args:
+        table: pandas SQLTable being written
+        conn: SQLAlchemy connection
+        keys: Column names, in row order
+        data_iter: Iterable of row tuples
+        
+    Returns:
+        int: Number of rows copied
+    """
+    buf = io.StringIO()
+    csv.writer(buf).writerows(data_iter)
+    buf.seek(0)
+    
+    columns = ', '.join(f'"{k}"' for k in keys)
+    table_name = f'{table.schema}.{table.name}' if table.schema else table.name
+    
+    with conn.connection.cursor() as cur:
+        cur.copy_expert(f'COPY {table_name} ({columns}) FROM STDIN WITH CSV', buf)
+        return cur.rowcount
+
+# Columns loaded into power_consumption, in table order
+REQUIRED_COLS = ['county', 'year', 'month', 'sector', 'consumption_gwh']
+
+# Filter the CSV inside DuckDB so non-matching rows are never turned into
+# pandas objects. Columns are read as text and converted with TRY_CAST, so
+# malformed numbers become NULL and are dropped rather than failing the load
+FILTER_QUERY = """
+    SELECT county, year, month, sector, consumption_gwh
+    FROM (
+        SELECT county,
+               TRY_CAST(year AS SMALLINT) AS year,
+               TRY_CAST(month AS TINYINT) AS month,
+               sector,
+               TRY_CAST(consumption_gwh AS DOUBLE) AS consumption_gwh
+        FROM read_csv(?, all_varchar = true)
+    )
+    WHERE sector = 'Residential'
+      AND year BETWEEN 2022 AND 2024
+      AND month BETWEEN 1 AND 12
+      AND consumption_gwh IS NOT NULL
+"""
+
+# The reload creates the table in the same transaction as the COPY, so with
+# wal_level=minimal PostgreSQL skips WAL for the bulk load; the index is
+# built once all rows are in
+CREATE_TABLE_QUERY = """
+    CREATE TABLE power_consumption (
+        county TEXT,
+        year SMALLINT,
+        month SMALLINT,
+        sector TEXT,
+        consumption_gwh DOUBLE PRECISION
+    )
+"""
+
+# DuckDB vectors (2048 rows each) fetched per chunk; memory use is bounded
+# by one chunk of ~100k rows
+FETCH_VECTORS = 50
+
+def iter_filtered_chunks(csv_path):
+    """
+    Yield the valid Residential 2022-2024 rows of a CSV in DataFrame chunks.
+    
+    Args:
+        csv_path: Path to the electricity CSV file
+        
+    Yields:
+        pandas.DataFrame: Filtered rows with the required columns
+    """
+    with duckdb.connect() as con:
+        result = con.execute(FILTER_QUERY, [csv_path])
+        while True:
+            chunk = result.fetch_df_chunk(FETCH_VECTORS)
+            if chunk.empty:
+                return
+            yield chunk
+
+def prefetch(chunks):
+    """
+    Yield the chunks of an iterator while the next one is produced on a
+    background thread, so CSV parsing overlaps the COPY of the previous chunk.
+    
+    Args:
+        chunks: Iterator of DataFrame chunks
+        
+    Yields:
+        pandas.DataFrame: The same chunks, in order
+    """
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(next, chunks, None)
+        while True:
+            chunk = pending.result()
+            if chunk is None:
+                return
+            pending = pool.submit(next, chunks, None)
+            yield chunk
+
 def load_data_to_postgres():
     """
     Load electricity consumption data from CSV into PostgreSQL database.
+    
+    The CSV is read in chunks; each chunk is filtered and copied into the
+    table before the next one is parsed, so memory use does not grow with
+    the file size. The table is indexed once all rows are loaded.
     """
     try:
-        # 1. Read CSV file from data/ folder
+        # 1. Check the CSV file in the data/ folder
         csv_path = os.path.join('data', 'electricity_raw.csv')
         
         if not os.path.exists(csv_path):
@@ -23,62 +132,16 @@ def load_data_to_postgres():
             print("Please ensure the file exists in the data/ directory.")
             return False
         
-        print(f"📖 Reading CSV file: {csv_path}")
-        df = pd.read_csv(csv_path)
-        print(f"   Loaded {len(df)} rows")
-        
-        # 2. Filter for Residential sector and years 2022-2024
-        print("\n🔍 Filtering data for Residential sector (2022-2024)...")
-        df_filtered = df[
-            (df['sector'] == 'Residential') &
-            (df['year'] >= 2022) &
-            (df['year'] <= 2024)
-        ].copy()
-        print(f"   Filtered to {len(df_filtered)} rows")
-        
-        if len(df_filtered) == 0:
-            print("⚠️  Warning: No data matches the filter criteria")
-            return False
-        
-        # 3. Rename columns to match database schema
-        print("\n📝 Renaming columns...")
-        column_mapping = {
-            'county': 'county',
-            'year': 'year',
-            'month': 'month',
-            'sector': 'sector',
-            'consumption_gwh': 'consumption_gwh'
-        }
-        
-        # Check if required columns exist
-        required_cols = ['county', 'year', 'month', 'sector', 'consumption_gwh']
-        missing_cols = [col for col in required_cols if col not in df_filtered.columns]
+        # Check if required columns exist (reads only the header)
+        header = pd.read_csv(csv_path, nrows=0).columns
+        missing_cols = [col for col in REQUIRED_COLS if col not in header]
         
         if missing_cols:
             print(f"❌ Error: Missing required columns in CSV: {missing_cols}")
-            print(f"   Available columns: {df_filtered.columns.tolist()}")
+            print(f"   Available columns: {header.tolist()}")
             return False
         
-        # Rename columns to match the schema (in case they're different in CSV)
-        df_renamed = df_filtered[required_cols].copy()
-        
-        # Ensure month is integer between 1-12
-        if 'month' in df_renamed.columns:
-            df_renamed['month'] = pd.to_numeric(df_renamed['month'], errors='coerce')
-            df_renamed = df_renamed.dropna(subset=['month'])
-            df_renamed = df_renamed[
-                (df_renamed['month'] >= 1) & (df_renamed['month'] <= 12)
-            ]
-        
-        # Ensure consumption_gwh is numeric
-        if 'consumption_gwh' in df_renamed.columns:
-            df_renamed['consumption_gwh'] = pd.to_numeric(df_renamed['consumption_gwh'], errors='coerce')
-            df_renamed = df_renamed.dropna(subset=['consumption_gwh'])
-        
-        print(f"   Final data shape: {df_renamed.shape}")
-        print(f"   Sample data:\n{df_renamed.head()}")
-        
-        # 4. Connect to PostgreSQL using SQLAlchemy
+        # 2. Connect to PostgreSQL using SQLAlchemy
         print("\n🔌 Connecting to PostgreSQL database...")
         db_url = os.getenv('DB_URL')
         
@@ -93,25 +156,64 @@ def load_data_to_postgres():
         with engine.connect() as conn:
             print("✅ Successfully connected to database")
         
-        # 5. Insert data into power_consumption table
-        print("\n💾 Inserting data into power_consumption table...")
+        # 3. Stream the CSV filtered for Residential sector and years
+        # 2022-2024, inserting each chunk into power_consumption
+        print(f"\n📖 Streaming CSV file: {csv_path}")
+        print("   Filtering for Residential sector (2022-2024) and inserting into power_consumption...")
         
-        # Use if_exists='append' to add data without deleting existing records
-        # Use if_exists='replace' to delete and recreate the table
-        rows_inserted = df_renamed.to_sql(
-            'power_consumption',
-            engine,
-            if_exists='replace',  # Replace table data
-            index=False,
-            method='multi'  # Faster insertion for large datasets
-        )
+        rows_inserted = 0
+        years = set()
+        counties = set()
+        total_gwh = 0.0
+        
+        # Load every chunk in one transaction: the table is replaced
+        # atomically, and only the final commit waits for the WAL flush
+        with engine.begin() as conn:
+            # A crash can lose at most this reload, never corrupt data
+            conn.execute(text("SET LOCAL synchronous_commit = OFF"))
+            
+            for chunk in prefetch(iter_filtered_chunks(csv_path)):
+                # The first non-empty chunk recreates the table, so an input
+                # with no matching rows leaves the existing table untouched
+                if rows_inserted == 0:
+                    print(f"   Sample data:\n{chunk.head()}")
+                    conn.execute(text("DROP TABLE IF EXISTS power_consumption"))
+                    conn.execute(text(CREATE_TABLE_QUERY))
+                
+                rows_inserted += chunk.to_sql(
+                    'power_consumption',
+                    conn,
+                    if_exists='append',
+                    index=False,
+                    method=psql_insert_copy,  # COPY instead of INSERT statements
+                    # Hand COPY 10k rows at a time so the CSV buffer stays bounded;
+                    # COPY has no bind parameters, so PostgreSQL's 65535-parameter
+                    # statement limit never applies
+                    chunksize=10_000
+                )
+                
+                years.update(chunk['year'].unique().tolist())
+                counties.update(chunk['county'].unique().tolist())
+                total_gwh += chunk['consumption_gwh'].sum()
+            
+            # Build the lookup index after the bulk load instead of
+            # maintaining it row by row
+            if rows_inserted > 0:
+                conn.execute(text(
+                    "CREATE INDEX idx_power_county_year_month "
+                    "ON power_consumption (county, year, month)"
+                ))
+        
+        if rows_inserted == 0:
+            print("⚠️  Warning: No data matches the filter criteria")
+            return False
         
         print(f"✅ Successfully inserted {rows_inserted} rows into power_consumption table!")
         print("\n📊 Data Summary:")
-        print(f"   - Sectors: {df_renamed['sector'].unique()}")
-        print(f"   - Years: {sorted(df_renamed['year'].unique())}")
-        print(f"   - Counties: {len(df_renamed['county'].unique())}")
-        print(f"   - Total consumption: {df_renamed['consumption_gwh'].sum():.2f} GWh")
+        print("   - Sectors: ['Residential']")
+        print(f"   - Years: {sorted(years)}")
+        print(f"   - Counties: {len(counties)}")
+        print(f"   - Total consumption: {total_gwh:.2f} GWh")
         
         return True
         
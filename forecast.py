@@ -7,7 +7,13 @@ import pandas as pd
 import numpy as np
 import joblib
 import json
-from datetime import datetime, timedelta
+import threading
+
+
+# Angular step per unit for the cyclic features: a 4-year cycle over the
+# year and a 12-month seasonal cycle over the month
+YEAR_CYCLE = 2 * np.pi / 4.0
+MONTH_CYCLE = 2 * np.pi / 12.0
 
 
 def create_features(df):
@@ -17,11 +23,13 @@ def create_features(df):
     # Create datetime column
     df['date'] = pd.to_datetime(df[['year', 'month']].assign(day=1))
     
-    # Time features
-    df['year_sin'] = np.sin(2 * np.pi * df['year'] / 4.0)
-    df['year_cos'] = np.cos(2 * np.pi * df['year'] / 4.0)
-    df['month_sin'] = np.sin(2 * np.pi * df['month'] / 12.0)
-    df['month_cos'] = np.cos(2 * np.pi * df['month'] / 12.0)
+    # Time features; each angle is computed once and shared by sin and cos
+    year_angle = df['year'].to_numpy() * YEAR_CYCLE
+    month_angle = df['month'].to_numpy() * MONTH_CYCLE
+    df['year_sin'] = np.sin(year_angle)
+    df['year_cos'] = np.cos(year_angle)
+    df['month_sin'] = np.sin(month_angle)
+    df['month_cos'] = np.cos(month_angle)
     
     # Trend (relative to first date in dataset)
     min_date = df['date'].min()
@@ -36,6 +44,50 @@ def create_features(df):
     return df
 
 
+# Path for Hugging Face deployment (files in model/ subdirectory)
+MODEL_PATH = os.path.join("model", "unified_forecast_model.pkl")
+METADATA_PATH = os.path.join("model", "unified_model_metadata.json")
+
+# Model, metadata and county -> encoding lookup, loaded once per process
+_MODEL = None
+_META = None
+_COUNTY_TO_CODE = None
+_INIT_LOCK = threading.Lock()
+
+
+def _lazy_init():
+    """
+    Load the unified model and its metadata on first use.
+    
+    Safe to call from several threads; only the first call reads the files.
+    
+    Raises:
+        FileNotFoundError: If the model or metadata file is missing
+    """
+    global _MODEL, _META, _COUNTY_TO_CODE
+    
+    if _MODEL is not None:
+        return
+    
+    with _INIT_LOCK:
+        if _MODEL is not None:
+            return
+        
+        if not os.path.exists(MODEL_PATH):
+            raise FileNotFoundError(f"Model not found at {MODEL_PATH}. Please train the model first.")
+        
+        if not os.path.exists(METADATA_PATH):
+            raise FileNotFoundError(f"Metadata not found at {METADATA_PATH}.")
+        
+        with open(METADATA_PATH, 'r') as f:
+            meta = json.load(f)
+        
+        _COUNTY_TO_CODE = {v: k for k, v in meta['county_mapping'].items()}
+        _META = meta
+        # Assigned last: a loaded model means initialization is complete
+        _MODEL = joblib.load(MODEL_PATH)
+
+
 def get_forecast(county: str, periods: int = 12):
     """
     Get forecast using the unified model for any county.
@@ -47,98 +99,80 @@ def get_forecast(county: str, periods: int = 12):
     Returns:
         dict: Forecast predictions
     """
-    # Load model and metadata
-    # Path for Hugging Face deployment (files in model/ subdirectory)
-    model_path = os.path.join("model", "unified_forecast_model.pkl")
-    metadata_path = os.path.join("model", "unified_model_metadata.json")
-    
-    if not os.path.exists(model_path):
-        raise FileNotFoundError(f"Model not found at {model_path}. Please train the model first.")
-    
-    if not os.path.exists(metadata_path):
-        raise FileNotFoundError(f"Metadata not found at {metadata_path}.")
-    
-    # Load model and metadata
-    model = joblib.load(model_path)
-    with open(metadata_path, 'r') as f:
-        metadata = json.load(f)
-    
-    # Check if county exists in training data
-    if county not in metadata['counties']:
+    # Load model and metadata (only the first call reads the files)
+    _lazy_init()
+    model, metadata, county_to_code = _MODEL, _META, _COUNTY_TO_CODE
+    
+    # Get county encoding; one dict lookup also checks the county exists in
+    # the training data, and the error text is only built on a miss
+    county_encoded = county_to_code.get(county)
+    if county_encoded is None:
         raise ValueError(
             f"County '{county}' not found in model. "
             f"Available counties: {', '.join(metadata['counties'])}"
         )
     
-    # Get county encoding
-    county_mapping = {v: k for k, v in metadata['county_mapping'].items()}
-    county_encoded = county_mapping[county]
-    
     # Load historical data for this county to get context
     # For simplicity, we'll use the model to generate forecasts based on time features only
     # In production, you'd load recent actuals to compute lags
     
-    # Generate future dates
-    start_date = datetime(2024, 12, 1)  # Start from last month
-    future_dates = [start_date + timedelta(days=31*i) for i in range(1, periods+1)]
-    
-    # Create future dataframe
-    future_data = []
-    for i, date in enumerate(future_dates):
-        year = date.year
-        month = date.month
-        
-        # Create features for this future point
-        features = {
-            'county_encoded': county_encoded,
-            'year': year,
-            'month': month,
-            'year_sin': np.sin(2 * np.pi * year / 4.0),
-            'year_cos': np.cos(2 * np.pi * year / 4.0),
-            'month_sin': np.sin(2 * np.pi * month / 12.0),
-            'month_cos': np.cos(2 * np.pi * month / 12.0),
-            'trend': 3.5 + i / 12.0,  # Estimated trend
-            'lag_1': None,  # Will fill with prediction
-            'lag_12': None,  # Will fill with prediction
-            'rolling_mean_3': None  # Will fill with prediction
-        }
-        future_data.append(features)
+    # Generate future dates: month starts following the last month (2024-12)
+    future_dates = pd.date_range(start='2025-01-01', periods=periods, freq='MS')
+    year = future_dates.year.to_numpy(dtype=np.int64)
+    month = future_dates.month.to_numpy(dtype=np.int64)
+    year_angle = year * YEAR_CYCLE
+    month_angle = month * MONTH_CYCLE
     
-    # Simple forward-fill approach for lags (use previous predictions)
+    # Use a simple seasonal average as lag estimates
     # This is a simplification - in production you'd use actual historical data
-    for i in range(len(future_data)):
-        # Use a simple seasonal average as lag estimates
-        avg_kwh = 800  # Reasonable estimate
-        future_data[i]['lag_1'] = float(avg_kwh)
-        future_data[i]['lag_12'] = float(avg_kwh)
-        future_data[i]['rolling_mean_3'] = float(avg_kwh)
-    
-    # Convert to DataFrame with proper dtypes
-    feature_cols = metadata['features']
-    future_df = pd.DataFrame(future_data)[feature_cols]
-    
-    # Ensure proper data types
-    future_df['county_encoded'] = future_df['county_encoded'].astype(int)
-    for col in ['year', 'month']:
-        future_df[col] = future_df[col].astype(int)
-    
-    # Generate predictions
-    predictions = model.predict(future_df)
-    
-    # Format results
-    forecast = []
-    for i, (date, pred) in enumerate(zip(future_dates, predictions)):
-        # Calculate confidence interval (simplified)
-        std_error = np.std(predictions) * 0.1  # Rough estimate
-        lower_bound = pred - 1.96 * std_error
-        upper_bound = pred + 1.96 * std_error
-        
-        forecast.append({
-            'date': date.strftime('%Y-%m-%d'),
-            'predicted_kwh': round(float(pred), 2),
-            'lower_bound': round(max(0, float(lower_bound)), 2),
-            'upper_bound': round(float(upper_bound), 2)
-        })
+    avg_kwh = np.full(periods, 800.0)  # Reasonable estimate
+    
+    # Every feature column for all future points at once
+    feature_values = {
+        'county_encoded': int(county_encoded),
+        'year': year,
+        'month': month,
+        'year_sin': np.sin(year_angle),
+        'year_cos': np.cos(year_angle),
+        'month_sin': np.sin(month_angle),
+        'month_cos': np.cos(month_angle),
+        'trend': 3.5 + np.arange(periods) / 12.0,  # Estimated trend
+        'lag_1': avg_kwh,
+        'lag_12': avg_kwh,
+        'rolling_mean_3': avg_kwh
+    }
+    
+    # Write the columns straight into the float32 matrix XGBoost predicts
+    # on, in the model's feature order, so predict makes no further copy
+    features = metadata['features']
+    X = np.empty((periods, len(features)), dtype=np.float32)
+    for i, name in enumerate(features):
+        X[:, i] = feature_values[name]
+    
+    # Generate predictions (the matrix carries no column names to check)
+    predictions = model.predict(X, validate_features=False)
+    
+    # Calculate confidence interval (simplified); one spread for all periods,
+    # computed on the model's float32 output
+    std_error = np.std(predictions) * 0.1  # Rough estimate
+    lower_bound = np.clip(predictions - 1.96 * std_error, 0, None)
+    upper_bound = predictions + 1.96 * std_error
+    
+    # Format results, rounding each column in one vectorized call
+    forecast = [
+        {
+            'date': date,
+            'predicted_kwh': predicted,
+            'lower_bound': lower,
+            'upper_bound': upper
+        }
+        for date, predicted, lower, upper in zip(
+            future_dates.strftime('%Y-%m-%d'),
+            np.round(predictions.astype(np.float64), 2).tolist(),
+            np.round(lower_bound.astype(np.float64), 2).tolist(),
+            np.round(upper_bound.astype(np.float64), 2).tolist()
+        )
+    ]
     
     return {
         'county': county,
@@ -150,12 +184,10 @@ def get_forecast(county: str, periods: int = 12):
 
 def list_available_counties():
     """List all counties available in the unified model"""
-    metadata_path = os.path.join("model", "unified_model_metadata.json")
-    
-    if not os.path.exists(metadata_path):
+    if not os.path.exists(METADATA_PATH):
         return []
     
-    with open(metadata_path, 'r') as f:
+    with open(METADATA_PATH, 'r') as f:
         metadata = json.load(f)
     
     return sorted(metadata['counties'])